@@ -0,0 +1,26 @@
+import math
+import os
+
+
+def usable_cpu_count() -> int:
+    """Number of CPUs this process can actually run on.
+
+    Takes the smallest of the cgroup v2 CPU quota (docker --cpus, PaaS CPU
+    limits), the scheduler affinity mask, and the host core count. The
+    affinity mask is Linux-only, and neither it nor the host count knows
+    about quotas.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+
+    return cpus
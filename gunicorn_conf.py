@@ -0,0 +1,31 @@
+import os
+
+from uvicorn_worker import UvicornWorker
+
+from cpu_limits import usable_cpu_count
+
+# -------------------------
+# GUNICORN CONFIG
+# -------------------------
+bind = f"0.0.0.0:{os.environ.get('PORT', '10000')}"
+
+
+class UvloopWorker(UvicornWorker):
+    # Pin the event loop and HTTP parser so a missing uvloop/httptools
+    # fails at boot instead of silently falling back to asyncio/h11.
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools"}
+
+
+# Handlers are async and stateless, so one event loop per usable CPU is
+# enough. usable_cpu_count() honours container CPU quotas, so a 1-CPU
+# container on a large host still starts a single worker.
+workers = int(os.environ.get("WEB_CONCURRENCY", usable_cpu_count()))
+worker_class = UvloopWorker
+
+# Import main.py once in the master so workers share it copy-on-write.
+preload_app = True
+
+# Small responses make connection setup the dominant cost, so keep idle
+# connections open well past uvicorn's 5s default. Should stay above the
+# idle timeout of any proxy or load balancer in front.
+keepalive = int(os.environ.get("KEEPALIVE_SECONDS", 75))
@@ -1,8 +1,11 @@
+import asyncio
 import os
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints
+from typing import Annotated, Optional, Union
+
+from cpu_limits import usable_cpu_count
 
 app = FastAPI(
     title="Prime Event Rentals – Tool API",
@@ -10,6 +13,66 @@ app = FastAPI(
     version="1.1.0"
 )
 
+# -------------------------
+# ADMISSION CONTROL
+# -------------------------
+# The limit is per worker process. The default splits a server-wide budget
+# of min(usable CPUs * 8, 512) evenly across the gunicorn workers, so the
+# total in flight is workers * MAX_CONCURRENT_REQUESTS.
+_CPUS = usable_cpu_count()
+_WORKERS = int(os.environ.get("WEB_CONCURRENCY", _CPUS))
+MAX_CONCURRENT_REQUESTS = int(
+    os.environ.get("MAX_CONCURRENT_REQUESTS", max(1, min(_CPUS * 8, 512) // _WORKERS))
+)
+QUEUE_TIMEOUT_SECONDS = float(os.environ.get("QUEUE_TIMEOUT_SECONDS", 2.0))
+OVERLOADED_BODY = b'{"detail":"Server busy, retry shortly"}'
+
+
+class ConcurrencyLimitMiddleware:
+    """Caps in-flight /tools/* requests in this process; excess callers wait
+    in FIFO order for up to `queue_timeout` seconds, then get a 503. Each
+    gunicorn worker has its own semaphore, so the limit is per process."""
+
+    def __init__(self, app, limit: int, queue_timeout: float):
+        self.app = app
+        self.semaphore = asyncio.Semaphore(limit)
+        self.queue_timeout = queue_timeout
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith("/tools/"):
+            await self.app(scope, receive, send)
+            return
+
+        # Only pay for wait_for's task and timer when we actually have to queue.
+        if not self.semaphore.locked():
+            await self.semaphore.acquire()
+        else:
+            try:
+                await asyncio.wait_for(self.semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                response = Response(
+                    OVERLOADED_BODY,
+                    status_code=503,
+                    media_type="application/json",
+                    headers={"Retry-After": "1"},
+                )
+                await response(scope, receive, send)
+                return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.semaphore.release()
+
+
+# Registered before CORS so CORSMiddleware stays outermost and 503s still
+# carry CORS headers.
+app.add_middleware(
+    ConcurrencyLimitMiddleware,
+    limit=MAX_CONCURRENT_REQUESTS,
+    queue_timeout=QUEUE_TIMEOUT_SECONDS,
+)
+
 # -------------------------
 # 1. CORS CONFIGURATION (Crucial for External Access)
 # -------------------------
@@ -24,95 +87,158 @@ app.add_middleware(
 # -------------------------
 # MOCK DATA & CONFIG
 # -------------------------
+# item -> (price per day, available quantity)
 EQUIPMENT_DB = {
-    "chairs": {"price": 5, "available": 300},
-    "tables": {"price": 15, "available": 80},
-    "canopy": {"price": 250, "available": 10},
-    "sound_system": {"price": 400, "available": 5},
-    "generator": {"price": 350, "available": 4}
+    "chairs": (5, 300),
+    "tables": (15, 80),
+    "canopy": (250, 10),
+    "sound_system": (400, 5),
+    "generator": (350, 4)
 }
 DELIVERY_FEE = 100
 
+# Static response bodies, serialized once at import time. Callers wrap them
+# in a fresh Response per request: a shared Response instance would have its
+# header list mutated by CORSMiddleware on every call.
+HEALTH_BODY = b'{"status":"ok","service":"Prime Event Rentals Tools"}'
+ITEM_UNAVAILABLE_BODY = b'{"available":false,"reason":"Item not found"}'
+ITEM_NOT_FOUND_BODY = b'{"detail":"Item not found"}'
+
 # -------------------------
 # MODELS
 # -------------------------
+# Bounds are enforced by pydantic-core while parsing, so oversized or
+# malformed payloads are rejected before any Python handler code runs.
+# Item names are stripped and lowercased during validation.
+ItemName = Annotated[str, StringConstraints(max_length=64, strip_whitespace=True, to_lower=True)]
+Quantity = Annotated[int, Field(ge=1, le=10_000)]
+
+STRICT_BODY = ConfigDict(extra="forbid", str_max_length=128)
+
 class AvailabilityRequest(BaseModel):
-    item: str
-    quantity: int
+    model_config = STRICT_BODY
+
+    item: ItemName
+    quantity: Quantity
     event_date: str
 
 class PriceRequest(BaseModel):
-    item: str
-    quantity: int
-    days: int
+    model_config = STRICT_BODY
+
+    item: ItemName
+    quantity: Quantity
+    days: Annotated[int, Field(ge=1, le=365)]
 
 class BookingRequest(BaseModel):
+    model_config = STRICT_BODY
+
     customer_name: str
     phone: str
-    item: str
-    quantity: int
+    item: ItemName
+    quantity: Quantity
     event_date: str
     location: str
 
 class HandoffRequest(BaseModel):
+    model_config = STRICT_BODY
+
     name: str
     phone: str
-    message: Optional[str] = None
+    message: Optional[str] = Field(default=None, max_length=1000)
+
+# Declaring response models lets FastAPI serialize successful responses
+# straight to JSON bytes in pydantic-core.
+class ItemUnavailableResponse(BaseModel):
+    available: bool
+    reason: str
+
+class AvailabilityResponse(BaseModel):
+    item: str
+    requested_quantity: int
+    available: bool
+    available_quantity: int
+
+class PriceBreakdown(BaseModel):
+    subtotal: int
+    delivery: int
+
+class PriceResponse(BaseModel):
+    item: str
+    total_price: int
+    currency: str
+    breakdown: PriceBreakdown
+
+class BookingResponse(BaseModel):
+    status: str
+    message: str
+    booking_details: BookingRequest
+
+class HandoffResponse(BaseModel):
+    status: str
+    message: str
 
 # -------------------------
 # ENDPOINTS
 # -------------------------
 
 @app.get("/")
-def health():
-    return {"status": "ok", "service": "Prime Event Rentals Tools"}
+async def health():
+    return Response(HEALTH_BODY, media_type="application/json")
 
-@app.post("/tools/check-availability")
+@app.post(
+    "/tools/check-availability",
+    response_model=Union[AvailabilityResponse, ItemUnavailableResponse]
+)
 async def check_availability(payload: AvailabilityRequest):
-    item = payload.item.lower()
-    if item not in EQUIPMENT_DB:
-        return {"available": False, "reason": "Item not found"}
-    
-    available_qty = EQUIPMENT_DB[item]["available"]
-    return {
-        "item": item,
-        "requested_quantity": payload.quantity,
-        "available": payload.quantity <= available_qty,
-        "available_quantity": available_qty
-    }
-
-@app.post("/tools/calculate-price")
+    item = payload.item
+    row = EQUIPMENT_DB.get(item)
+    if row is None:
+        return Response(ITEM_UNAVAILABLE_BODY, media_type="application/json")
+
+    _, available_qty = row
+    return AvailabilityResponse(
+        item=item,
+        requested_quantity=payload.quantity,
+        available=payload.quantity <= available_qty,
+        available_quantity=available_qty
+    )
+
+@app.post(
+    "/tools/calculate-price",
+    response_model=Union[PriceResponse, ItemUnavailableResponse]
+)
 async def calculate_price(payload: PriceRequest):
-    item = payload.item.lower()
-    if item not in EQUIPMENT_DB:
-        return {"available": False, "reason": "Item not found"}
+    item = payload.item
+    row = EQUIPMENT_DB.get(item)
+    if row is None:
+        return Response(ITEM_UNAVAILABLE_BODY, media_type="application/json")
 
-    unit_price = EQUIPMENT_DB[item]["price"]
+    unit_price, _ = row
     subtotal = unit_price * payload.quantity * payload.days
     total = subtotal + DELIVERY_FEE
 
-    return {
-        "item": item,
-        "total_price": total,
-        "currency": "GHS",
-        "breakdown": {"subtotal": subtotal, "delivery": DELIVERY_FEE}
-    }
+    return PriceResponse(
+        item=item,
+        total_price=total,
+        currency="GHS",
+        breakdown=PriceBreakdown(subtotal=subtotal, delivery=DELIVERY_FEE)
+    )
 
-@app.post("/tools/create-booking")
+@app.post("/tools/create-booking", response_model=BookingResponse)
 async def create_booking(payload: BookingRequest):
-    item = payload.item.lower()
+    item = payload.item
     if item not in EQUIPMENT_DB:
-        raise HTTPException(status_code=404, detail="Item not found")
+        return Response(ITEM_NOT_FOUND_BODY, status_code=404, media_type="application/json")
 
-    return {
-        "status": "pending",
-        "message": "Booking received externally.",
-        "booking_details": payload.dict()
-    }
+    return BookingResponse(
+        status="pending",
+        message="Booking received externally.",
+        booking_details=payload
+    )
 
-@app.post("/tools/handoff")
+@app.post("/tools/handoff", response_model=HandoffResponse)
 async def human_handoff(payload: HandoffRequest):
-    return {
-        "status": "received",
-        "message": f"Team member will contact {payload.name} shortly."
-    }
+    return HandoffResponse(
+        status="received",
+        message=f"Team member will contact {payload.name} shortly."
+    )